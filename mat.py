@@ -1,20 +1,38 @@
 #!/usr/bin/python3
 import requests
-import importlib.machinery
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import importlib.util
 import datetime
 from datetime import timedelta
 import argparse
+import concurrent.futures
+import operator
 import os
 import re
 import sys
 from mats.print_stream import PrintStream
 import traceback
 from collections import namedtuple
+from dataclasses import dataclass, field
+from typing import Optional
 
 try:
-    from bs4 import BeautifulSoup
+    from bs4 import BeautifulSoup, SoupStrainer
 except:
     BeautifulSoup = None
+    SoupStrainer = None
+
+try:
+    import lxml
+    HTML_PARSER = 'lxml'
+except:
+    HTML_PARSER = 'html.parser'
+
+try:
+    import requests_cache
+except:
+    requests_cache = None
 
 try:
     import fitz
@@ -27,7 +45,12 @@ except:
     json = None
 
 MAT_DIR = '.mat'
+HTTP_CACHE_PATH = os.path.join('.cache', 'mat', 'http_cache')
+# Shorter than the 30 minute rebuild in web/update-menu.sh, so morning menu updates
+# are picked up. Expired pages with an ETag/Last-Modified are revalidated cheaply.
+HTTP_CACHE_EXPIRY = timedelta(minutes=20)
 INFERRED_TITLE_MAX_LENGTH = 50
+TITLE_TAIL_RE = re.compile(r"[ .,-:;!]+[^ ]+$")
 
 def truncate(max_length, str):
     if len(str) > max_length:
@@ -35,27 +58,66 @@ def truncate(max_length, str):
     else:
         return str
 
+@dataclass(slots=True)
 class Food:
-    def __init__(self, title, description):
-        self.title = truncate(100, title.strip().replace('\n', ' ')) if title else title
-        self.description = description.strip() if description else description
+    title: Optional[str]
+    description: Optional[str]
+
+    def __post_init__(self):
+        self.title = truncate(100, self.title.strip().replace('\n', ' ')) if self.title else self.title
+        self.description = self.description.strip() if self.description else self.description
 
     def pretty(self):
         return f"{self.title}\n  {self.description}"
 
+@dataclass(slots=True)
 class Restaurant:
-    def __init__(self, name, dishes=[], error=None, errorTrace=None):
-        self.name = name
-        self.dishes = dishes
-        self.error = error
-        self.errorTrace = errorTrace
+    name: str
+    dishes: list = field(default_factory=list)
+    error: Optional[Exception] = None
+    errorTrace: Optional[str] = None
+
+def cached_session():
+    if not requests_cache:
+        return None
+    try:
+        return requests_cache.CachedSession(
+            os.path.join(os.getenv('HOME'), HTTP_CACHE_PATH),
+            expire_after = HTTP_CACHE_EXPIRY,
+            allowable_codes = [200],
+            # Honour the site's Cache-Control/Expires over expire_after.
+            # Pages sent with no-store, or max-age=0 and no validators, aren't cached at all.
+            cache_control = True
+        )
+    except:
+        # An unwritable or broken cache shouldn't stop us from showing the menu
+        return None
+
+def http_client():
+    session = cached_session()
+    if session is None:
+        session = requests.Session()
+
+    # Share keep-alive connections between plugins hitting the same host
+    session.headers.update({'User-Agent': 'mat/1.0'})
+    adapter = HTTPAdapter(
+        pool_connections = 8,
+        pool_maxsize = 16,
+        max_retries = Retry(total = 2, backoff_factor = 0.2)
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
 
 class FoodAPI:
     soup = BeautifulSoup
-    requests = requests
+    html_parser = HTML_PARSER
+    strainer = SoupStrainer
+    requests = http_client()
     pdf = fitz
     json = json
     food = Food
+    today = None
 
     def week_of(self, date):
         return date.isocalendar()[1]
@@ -67,10 +129,10 @@ class FoodAPI:
         return self.week_of(date) % 2 == 0
 
     def is_today(self, date):
-        return date == datetime.date.today()
+        return date == self.today
 
     def is_current_week(self, date):
-        return self.week_of(date) == self.week_of(datetime.date.today())
+        return self.week_of(date) == self.week_of(self.today)
 
     def is_weekday(self, date):
         return date.isoweekday() <= 5
@@ -95,7 +157,7 @@ def color_codes(use_color):
 class Mat:
     def __init__(self, settings):
         self.settings = settings
-        self._plugins = None
+        self._plugins = list(self._load_plugins())
         self.stream = PrintStream(settings.color_codes.reset)
 
     def __print_date_heading(self, date):
@@ -107,25 +169,32 @@ class Mat:
 
     def _load_plugins(self):
         directory = self.settings.plugin_directory
-        for file in sorted(os.listdir(directory)):
-            if file[-3:] == ".py":
-                module = file[0:-3]
-                path = os.path.join(directory, file)
-                loader = importlib.machinery.SourceFileLoader(module, path)
-                yield loader.load_module(module)
+        with os.scandir(directory) as entries:
+            files = sorted(e.name for e in entries if e.name.endswith(".py") and e.is_file())
+        for file in files:
+            module = file[0:-3]
+            path = os.path.join(directory, file)
+            spec = importlib.util.spec_from_file_location(module, path)
+            plugin = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(plugin)
+            yield plugin
 
     def infer_title(self, description):
         if len(description) > INFERRED_TITLE_MAX_LENGTH:
             truncated_description = description[:INFERRED_TITLE_MAX_LENGTH-3].strip()
             if description[INFERRED_TITLE_MAX_LENGTH-2] == " ":
                 return (truncated_description + "...")
-            return re.sub(r"[ .,-:;!]+[^ ]+$", "", truncated_description) + "..."
+            return TITLE_TAIL_RE.sub("", truncated_description) + "..."
         else:
             return description
 
     def make_resturant(self, plugin, date):
         name = plugin.name()
+        applicable = getattr(plugin, 'applicable', lambda api, date: True)
         try:
+            # Skip plugins that know they have nothing to offer before they hit the network
+            if not applicable(foodAPI, date):
+                return Restaurant(name, [])
             return Restaurant(name, plugin.food(foodAPI, date))
         except Exception as e:
             return Restaurant(name, error=e, errorTrace=traceback.format_exc())
@@ -164,15 +233,20 @@ class Mat:
 
     def get_dishes(self, date):
         if not self._plugins:
-            self._plugins = self._load_plugins()
-        restaurants = map(lambda p: self.make_resturant(p, date), self._plugins)
-        filtered_restaurants = filter(
-            lambda r: r.dishes or (not self.settings.quiet and r.error != None),
-            restaurants
-        )
-        return sorted(filtered_restaurants, key = lambda r: r.name)
+            return []
+
+        # Plugins are network bound, so fetch them all at once.
+        # make_resturant catches plugin errors, so one failure won't sink the rest.
+        workers = min(32, len(self._plugins))
+        with concurrent.futures.ThreadPoolExecutor(max_workers = workers) as executor:
+            restaurants = list(executor.map(lambda p: self.make_resturant(p, date), self._plugins))
+        kept = [r for r in restaurants if r.dishes or (not self.settings.quiet and r.error is not None)]
+        kept.sort(key = operator.attrgetter('name'))
+        return kept
 
     def print_menu(self, date):
+        # Pin "today" for all plugins so they agree even if we run past midnight
+        foodAPI.today = date
         if self.settings.tomorrow:
             date += timedelta(days=1)
 
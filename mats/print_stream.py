@@ -1,3 +1,4 @@
+import io
 import sys
 
 from adt import adt, Case
@@ -49,12 +50,24 @@ class PrintStream:
         return self
 
     def print(self):
+        # Collect output and write it in one go instead of once per line
+        buffer = io.StringIO()
+        def flush():
+            sys.stdout.write(buffer.getvalue())
+            buffer.seek(0)
+            buffer.truncate()
+        def error(e, col):
+            # Write what we have first, to keep errors next to their restaurant
+            flush()
+            print(self.__pretty__(e, col), file=sys.stderr)
+
         for line in self.data:
             line.match(
-                error= lambda e, col: print(self.__pretty__(e, col), file=sys.stderr),
-                line= lambda e, col: print(self.__pretty__(e, col)),
+                error= error,
+                line= lambda e, col: buffer.write(self.__pretty__(e, col) + "\n"),
                 indentation= lambda indent: self.__indent__(indent)
             )
+        flush()
     
     def __pretty__(self, string, color):
         if(color != None and self.error != None):
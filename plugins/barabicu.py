@@ -1,5 +1,3 @@
-import datetime
-
 __days = [
     "Mondays Lunch",
     "Tuesdays Lunch",
@@ -8,32 +6,46 @@ __days = [
     "Fridays Lunch"
 ]
 
+def applicable(api, date):
+    return api.is_current_week(date) and api.is_weekday(date)
+
+def starts_with(element, heading):
+    # Only look at the first piece of text; get_text() would join the whole subtree
+    return next(element.stripped_strings, "").startswith(heading)
+
 def food(api, date):
-    if not api.is_current_week(date):
-        return []
-    if not api.is_weekday(date):
+    if not applicable(api, date):
         return []
     if not api.soup:
         return []
 
     response = api.requests.get('https://barabicu.se')
-    soup = api.soup(response.content, 'html.parser')
+    soup = api.soup(response.content, api.html_parser, parse_only = api.strainer("li"))
 
     li_elements = soup.find_all("li")
     lunch_heading = __days[date.isoweekday()-1]
 
     # Barabicu don't seem to update the heading in sync with the actual date,
     # so we can't assume "Todays Lunch" is the right heading just because date is today.
-    today_elements = list(filter(lambda e: e.get_text().startswith(lunch_heading), li_elements))
-    if not today_elements:
-        if date == datetime.date.today():
-            today_elements = filter(lambda e: e.get_text().startswith("Todays Lunch"), li_elements)
+    today_element = next((e for e in li_elements if starts_with(e, lunch_heading)), None)
+    if today_element is None:
+        if date == api.today:
+            today_element = next((e for e in li_elements if starts_with(e, "Todays Lunch")), None)
+            if today_element is None:
+                raise LookupError(f"Found neither \"{lunch_heading}\" nor \"Todays Lunch\" on the page")
         else:
             return []
 
-    today_element = list(today_elements)[0]
-    dishes = filter(lambda e: e.get_text(), today_element.find_all("h3"))
-    descriptions = today_element.find_all("p")
+    # Walk the element once, pairing each dish heading with the paragraph after it
+    pairs = []
+    current_dish = None
+    for element in today_element.find_all(["h3", "p"]):
+        if element.name == "h3":
+            if element.get_text():
+                current_dish = element
+        elif current_dish is not None:
+            pairs.append((current_dish, element))
+            current_dish = None
 
     def make_food(dish_description):
         (dish, description) = dish_description
@@ -42,7 +54,7 @@ def food(api, date):
         dish_name = " ".join(cleaned_words).title()
         return api.food(dish_name, description.get_text())
 
-    return list(map(make_food, zip(dishes, descriptions)))
+    return list(map(make_food, pairs))
 
 def name():
     return "Barabicu"
@@ -1,14 +1,59 @@
+import codecs
+import html
 import re
 
-def food(api, date):
-    if not api.is_today(date):
+# The menu is a flat list of "greybold" headings, each followed by a <td> with the dish.
+# Neither may contain markup, and nothing may come between a heading and its <td>.
+ROW_RE = re.compile(
+    rb'<[^>]*class="greybold"[^>]*>([^<]+)</[^>]+>(?:(?!greybold|<td).)*<td[^>]*>([^<]+)</td>',
+    re.S)
+HEADING_RE = re.compile(rb'class="greybold"')
+CELL_RE = re.compile(rb'<td[\s>]')
+DIV_RE = re.compile(rb'<(/?)div[\s>]', re.I)
+CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.I)
+
+def menu_region(content):
+    # Slice out the righttextarea div, minding nested divs
+    start = content.find(b'id="righttextarea"')
+    tag_start = content.rfind(b'<', 0, start)
+    if start < 0 or tag_start < 0 or not DIV_RE.match(content, tag_start):
+        return None
+    depth = 0
+    for m in DIV_RE.finditer(content, tag_start):
+        depth += -1 if m.group(1) else 1
+        if depth == 0:
+            return content[tag_start:m.end()]
+    return None
+
+def regex_rows(content, fallback_encoding = None):
+    region = menu_region(content)
+    if region is None:
         return []
-    if not api.soup:
+    rows = ROW_RE.findall(region)
+
+    # Every heading and every cell must be accounted for,
+    # otherwise something had markup in it and the pairing can't be trusted
+    if len(rows) != len(HEADING_RE.findall(region)) or len(rows) != len(CELL_RE.findall(region)):
+        return []
+
+    # Like BS4, trust the page's <meta charset> before guessing
+    declared = CHARSET_RE.search(content)
+    encoding = declared.group(1).decode('ascii') if declared else fallback_encoding
+    try:
+        codecs.lookup(encoding or '')
+    except LookupError:
+        encoding = 'utf-8'
+    decode = lambda b: html.unescape(b.decode(encoding, 'replace'))
+    return [(decode(t), decode(d)) for (t, d) in rows]
+
+def applicable(api, date):
+    return api.is_today(date)
+
+def food(api, date):
+    if not applicable(api, date):
         return []
 
     response = api.requests.get('http://www.restaurangsolrosen.se')
-    soup = api.soup(response.content, 'html.parser')
-    menu = soup.find(id = "righttextarea")
 
     def format_food(food_type, food_description):
         if food_type == "Lasagne":
@@ -16,18 +61,34 @@ def food(api, date):
         else:
             return food_description
 
-    def get_dishes(element):
-        types = element.find_all(class_ = "greybold")
-        descriptions = element.find_all("td")
-        for (food_type, description) in zip(types, descriptions):
-            type_text = re.sub("Dagens ([^:]+): \d+ kr", "\\1", food_type.get_text().strip())
-            description_text = description.get_text().strip()
+    def soup_rows(content):
+        strainer = api.strainer(id = "righttextarea")
+        soup = api.soup(content, api.html_parser, parse_only = strainer)
+        menu = soup.find(id = "righttextarea")
+        types = menu.find_all(class_ = "greybold")
+        descriptions = menu.find_all("td")
+        return [(t.get_text(), d.get_text()) for (t, d) in zip(types, descriptions)]
+
+    def get_dishes(rows):
+        dishes = []
+        for (food_type, description) in rows:
+            # Headings are always on the form "Dagens <type>: <price> kr"
+            type_text = food_type.strip().split(':', 1)[0].removeprefix('Dagens ')
+            description_text = description.strip()
 
             # Sallad is always the same
             if type_text != "Sallad":
-                yield api.food(None, format_food(type_text, description_text))
+                dishes.append(api.food(None, format_food(type_text, description_text)))
+        return dishes
+
+    # The regex is much cheaper than building a soup; only fall back if the layout changed
+    rows = regex_rows(response.content, response.apparent_encoding)
+    if not rows:
+        if not api.soup:
+            return []
+        rows = soup_rows(response.content)
 
-    return get_dishes(menu)
+    return get_dishes(rows)
 
 def name():
     return "Solrosen"
@@ -0,0 +1,47 @@
+import importlib.util
+import os
+import unittest
+
+path = os.path.join(os.path.dirname(__file__), '..', 'plugins', 'solrosen.py')
+spec = importlib.util.spec_from_file_location('solrosen', path)
+solrosen = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(solrosen)
+
+def page(rows, charset = 'utf-8'):
+    return (
+        f'<html><head><meta charset="{charset}"></head><body>'
+        '<div id="righttextarea"><div>Lunch</div><table>'
+        f'{rows}'
+        '</table></div>'
+        '<span class="greybold">Dagens annat: 10 kr</span><table><tr><td>Utanför</td></tr></table>'
+        '</body></html>'
+    ).encode(charset)
+
+def row(heading, dish):
+    return f'<tr><span class="greybold">{heading}</span></tr><tr><td>{dish}</td></tr>'
+
+class RegexRowsTest(unittest.TestCase):
+    def test_pairs_headings_with_dishes(self):
+        content = page(row('Dagens kött: 95 kr', 'Köttbullar &amp; mos') + row('Dagens fisk: 95 kr', 'Strömming'))
+        self.assertEqual(solrosen.regex_rows(content), [
+            ('Dagens kött: 95 kr', 'Köttbullar & mos'),
+            ('Dagens fisk: 95 kr', 'Strömming'),
+        ])
+
+    def test_uses_declared_charset(self):
+        content = page(row('Dagens kött: 95 kr', 'Köttbullar'), charset = 'iso-8859-1')
+        self.assertEqual(solrosen.regex_rows(content, 'utf-8'), [('Dagens kött: 95 kr', 'Köttbullar')])
+
+    def test_rejects_markup_in_dish(self):
+        content = page(row('Dagens kött: 95 kr', 'Köttbullar<br>med mos') + row('Dagens fisk: 95 kr', 'Strömming'))
+        self.assertEqual(solrosen.regex_rows(content), [])
+
+    def test_rejects_markup_in_heading(self):
+        content = page(row('Dagens <b>kött</b>: 95 kr', 'Köttbullar') + row('Dagens fisk: 95 kr', 'Strömming'))
+        self.assertEqual(solrosen.regex_rows(content), [])
+
+    def test_missing_menu(self):
+        self.assertEqual(solrosen.regex_rows(b'<html><body></body></html>'), [])
+
+if __name__ == '__main__':
+    unittest.main()